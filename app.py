@@ -4,28 +4,31 @@ import streamlit as st
 st.set_page_config(layout="wide", page_title="Job Application Assistant")
 
 import pandas as pd
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from enum import Enum
+from typing import Type
 from sqlalchemy.orm import Session
 import logging # Added import for logging
 
 from core.database import Base, engine
-from core.database.base import get_db
+from core.database.base import get_db_context
+from core.database.schemas import ApplicationStatus, SubmissionMethod
 from core.controllers.job_tracker_controller import JobTrackerController
 from core.services.file_service import FileService
 from core.ui.job_tracker_ui import (
     render_database_display_section,
     render_main_action_tabs
 )
+from core.ui.base import APPLICATIONS_CACHE_TTL, get_applications_cache_key, bump_applications_version
 from core.ui.llm_setup import (
     render_complete_sidebar,
     initialize_llm_on_startup,
     get_current_prompt_service
 )
 
-# Initialize logger
+# Initialize logger (configure the root logger only once, not on every rerun)
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # --- Ensure Data Directory Exists ---
 # This must be done before database initialization to prevent file path errors
@@ -36,18 +39,20 @@ if not success:
 else:
     logger.info(message)
 
-# Initialize database by creating all tables (idempotent)
-Base.metadata.create_all(bind=engine)
+# Initialize database by creating all tables (idempotent, once per process)
+@st.cache_resource(show_spinner=False)
+def initialize_database_schema() -> bool:
+    """Create any missing database tables."""
+    Base.metadata.create_all(bind=engine)
+    return True
+
+initialize_database_schema()
 
 # --- Check for Force Restart Flag ---
 if st.session_state.get('force_restart_after_reset', False):
-    # Clear the restart flag
+    # Clear the restart flag (caches were already cleared by the reset itself)
     st.session_state.force_restart_after_reset = False
     
-    # Force complete reinitialization by clearing all cached resources
-    if hasattr(st, 'cache_resource'):
-        st.cache_resource.clear()
-    
     # Show restart message
     st.info("🔄 Application restarted successfully with fresh database connection.")
     logger.info("Application successfully restarted after database reset")
@@ -58,14 +63,8 @@ st.caption("Manage your job applications with AI assistance")
 # --- Initialize Database and Controllers ---
 @st.cache_resource
 def initialize_controllers():
-    """Initialize controllers and database connection."""
-    try:
-        db = next(get_db())
-        job_tracker_controller = JobTrackerController()
-        return db, job_tracker_controller
-    except StopIteration:
-        st.error("Could not connect to database. Please try again.")
-        st.stop()
+    """Initialize controllers (stateless, shared by all sessions)."""
+    return JobTrackerController()
 
 # --- Initialize AI Backend ---
 @st.cache_resource
@@ -76,7 +75,7 @@ def initialize_ai_backend():
     return None
 
 # Initialize components
-db, job_tracker_controller = initialize_controllers()
+job_tracker_controller = initialize_controllers()
 
 # Initialize LLM on startup automatically
 initialize_llm_on_startup()
@@ -88,6 +87,18 @@ render_complete_sidebar()
 prompt_service = get_current_prompt_service()
 
 # --- Data Fetching Function ---
+display_columns = [
+    'application_id', 'job_title', 'job_company', 'job_date_submitted',
+    'resume_name', 'cover_letter_name', 'submission_method',
+    'current_status', 'status_timestamp'
+]
+
+def _as_categorical(values: pd.Series, choices: Type[Enum]) -> pd.Series:
+    """Cast a column to a categorical of the enum's values; unknown legacy values become extra categories."""
+    categories = [choice.value for choice in choices]
+    categories += sorted(set(values.dropna().unique()) - set(categories))
+    return values.astype(pd.CategoricalDtype(categories))
+
 def refresh_applications_display_data(db: Session) -> pd.DataFrame:
     """Fetches applications with their latest status for display."""
     result = job_tracker_controller.get_application_list(db)
@@ -100,144 +111,138 @@ def refresh_applications_display_data(db: Session) -> pd.DataFrame:
     if not applications:
         return pd.DataFrame()
     
-    # Transform the data for display
-    display_data = []
-    for app in applications:
-        # Extract filename from file paths for display
-        resume_name = ""
-        cover_letter_name = ""
-        
-        if app.get('resume_file_path'):
-            resume_name = app['resume_file_path'].split('/')[-1]
-        
-        if app.get('cover_letter_file_path'):
-            cover_letter_name = app['cover_letter_file_path'].split('/')[-1]
-        
-        # Rename date_submitted to job_date_submitted for consistency
-        app_data = {
-            'application_id': app['application_id'],  # Fixed: use 'application_id' not 'id'
-            'job_title': app['job_title'],
-            'job_company': app['job_company'],
-            'job_date_submitted': app.get('date_submitted', ''),
-            'resume_name': resume_name,
-            'cover_letter_name': cover_letter_name,
-            'submission_method': app.get('submission_method', ''),
-            'current_status': app.get('current_status', 'submitted'),
-            'status_timestamp': app.get('status_timestamp', '')
-        }
-        display_data.append(app_data)
+    # Build the frame in one go and derive display columns with vectorized ops
+    df = pd.DataFrame.from_records(applications)
     
-    return pd.DataFrame(display_data)
-
-# --- Main UI Layout ---
-
-# 1. Database Display Section (Fixed height)
-applications_display_df = refresh_applications_display_data(db)
-display_columns = [
-    'application_id', 'job_title', 'job_company', 'job_date_submitted',
-    'resume_name', 'cover_letter_name', 'submission_method',
-    'current_status', 'status_timestamp'
-]
+    # Rename date_submitted to job_date_submitted for consistency
+    df = df.rename(columns={'date_submitted': 'job_date_submitted'})
+    
+    # Submission dates are stored as ISO strings; parse them once so the table
+    # sorts real dates (unparseable values become empty)
+    df['job_date_submitted'] = pd.to_datetime(df['job_date_submitted'], errors='coerce', format='ISO8601')
+    
+    # Extract filename from file paths for display (handles both / and \ separators)
+    df['resume_name'] = df['resume_file_path'].fillna('').str.replace(r'.*[\\/]', '', regex=True)
+    df['cover_letter_name'] = df['cover_letter_file_path'].fillna('').str.replace(r'.*[\\/]', '', regex=True)
+    
+    # Statuses and submission methods are small closed sets; categorical codes
+    # keep comparisons and unique() cheap
+    df['current_status'] = _as_categorical(
+        df['current_status'].fillna(ApplicationStatus.SUBMITTED.value), ApplicationStatus
+    )
+    df['submission_method'] = _as_categorical(df['submission_method'], SubmissionMethod)
+    
+    # One case-folded search haystack per row so a search is a single column scan
+    search_columns = ['job_title', 'job_company', 'job_location', 'job_skills', 'job_tags']
+    df['_haystack'] = df[search_columns].fillna('').astype(str).agg('\x1f'.join, axis=1).str.casefold()
+    
+    # Arrow-backed columns let st.dataframe serialize the frame without per-row conversion
+    return df[display_columns + ['_haystack']].convert_dtypes(dtype_backend='pyarrow')
 
-render_database_display_section(applications_display_df, display_columns)
+@st.cache_data(ttl=APPLICATIONS_CACHE_TTL, show_spinner=False)
+def load_applications_display_data(_db: Session, version: int, ttl_bucket: int) -> pd.DataFrame:
+    """Cached applications display data; bump the version to invalidate after writes."""
+    return refresh_applications_display_data(_db)
 
-st.divider()
+# --- Main UI Layout ---
 
-# 2. Main Action Tabs Section
-render_main_action_tabs(
-    db, 
-    applications_display_df,
-    job_tracker_controller, 
-    prompt_service
-)
+# Sessions are not thread-safe and hold a pooled connection once used, so each
+# script run opens its own and closes it when the run ends (also on st.rerun);
+# fragments open their own for their reruns.
+with get_db_context() as db:
+    # 1. Database Display Section (Fixed height)
+    # Keep this session's frame until a write bumps the version or the TTL window
+    # rolls over; a cache_data hit would still unpickle a fresh copy on every rerun
+    apps_cache_key = get_applications_cache_key()
+    if st.session_state.get('apps_df_key') != apps_cache_key:
+        st.session_state.apps_df = load_applications_display_data(db, *apps_cache_key)
+        st.session_state.apps_df_key = apps_cache_key
+    applications_display_df = st.session_state.apps_df
+
+    render_database_display_section(applications_display_df, display_columns)
+
+    st.divider()
+
+    # 2. Main Action Tabs Section
+    render_main_action_tabs(
+        db, 
+        applications_display_df,
+        job_tracker_controller, 
+        prompt_service
+    )
 
 # --- Footer ---
 st.divider()
 st.caption("💡 Tip: Use the application tabs above to manage your job applications and analyze job descriptions.")
 
 # --- Database Management Section (Moved to bottom of main page) ---
-st.divider()
-st.subheader("Database Management")
-
-# Initialize session state flags if not already present
-if 'show_reset_confirmation' not in st.session_state:
-    st.session_state.show_reset_confirmation = False
-if 'confirm_reset_db' not in st.session_state:
-    st.session_state.confirm_reset_db = False
-
-# If "⚠️ Reset Database" is clicked, set flag to show confirmation UI
-if st.button("⚠️ Reset Database", key="reset_db_button_main"):
-    st.session_state.show_reset_confirmation = True
-    st.session_state.confirm_reset_db = False  # Ensure confirmation is reset if main button clicked again
-    st.rerun() # Rerun to display the confirmation UI elements
-
-# Display confirmation UI if show_reset_confirmation is true
-if st.session_state.show_reset_confirmation:
-    st.warning("This action will archive the current database and initialize a new, empty one. This cannot be undone.")
-    
-    # Use columns for a cleaner layout of confirmation buttons
-    col1, col2, col_spacer = st.columns([1, 1, 5]) 
-    with col1:
-        if st.button("✅ Confirm Reset", key="confirm_reset_action"):
-            st.session_state.confirm_reset_db = True       # Set flag to perform reset
-            st.session_state.show_reset_confirmation = False # Hide confirmation UI
-            st.rerun() # Rerun to process the actual reset action
-    with col2:
-        if st.button("❌ Cancel", key="cancel_reset_action"):
-            st.session_state.confirm_reset_db = False      # Ensure reset is not performed
-            st.session_state.show_reset_confirmation = False # Hide confirmation UI
-            st.info("Database reset cancelled.")
-            st.rerun() # Rerun to clear confirmation UI
-
-# Perform reset if 'confirm_reset_db' is true
-# This block is now evaluated independently after a rerun triggered by "Confirm Reset"
-if st.session_state.get('confirm_reset_db', False):
-    try:
-        success, message = job_tracker_controller.reset_database()
-        if success:
-            st.success(f"Database reset successful: {message}")
-            logger.info(f"Database reset successful: {message}")
-            
-            # CRITICAL: Force complete app restart after database reset
-            
-            # 1. Clear ALL cached resources and session state
-            initialize_controllers.clear()
-            if hasattr(initialize_ai_backend, 'clear'):
-                initialize_ai_backend.clear()
-            
-            # 2. Clear ALL session state except the restart flag
-            keys_to_keep = {'force_restart_after_reset'}
-            keys_to_delete = [key for key in st.session_state.keys() if key not in keys_to_keep]
-            for key in keys_to_delete:
-                del st.session_state[key]
-            
-            # 3. Set restart flag and force immediate refresh
-            st.session_state.force_restart_after_reset = True
-            
-            logger.info("Forcing complete application restart after database reset")
-            
-            # 4. Show restart message and force immediate rerun
-            st.info("🔄 Restarting application with fresh database...")
-            
-            # Use JavaScript to force a complete page refresh for maximum reset
-            st.markdown("""
-            <script>
-                setTimeout(function() {
-                    window.location.reload();
-                }, 1000);
-            </script>
-            """, unsafe_allow_html=True)
-            
-            # Also trigger Streamlit rerun as backup
-            st.rerun() 
-        else:
-            st.error(f"Database reset failed: {message}")
-            logger.error(f"Database reset failed: {message}")
-    except Exception as e:
-        st.error(f"An error occurred during database reset: {e}")
-        logger.error(f"Error resetting database from main page UI: {e}", exc_info=True)
-    finally:
-        # CRITICAL: Always reset the confirmation flag after the attempt
-        st.session_state.confirm_reset_db = False
-        # No rerun here on failure, so user can see the error message.
-        # If a rerun is desired even on failure, it might clear the error too quickly.
+# Reset flow states: "idle" -> "confirming" -> "confirmed" (or back to "idle" on cancel).
+# Buttons only move the state in on_click callbacks; the click's own rerun renders it.
+def _set_reset_state(state: str) -> None:
+    """Move the reset flow to the given state."""
+    st.session_state.reset_state = state
+
+def _cancel_reset() -> None:
+    """Return the reset flow to idle."""
+    st.session_state.reset_state = "idle"
+    st.toast("Database reset cancelled.")
+
+# Runs as a fragment so the reset confirmation buttons only rerun this section.
+@st.fragment
+def render_database_management_section() -> None:
+    """Render the database reset controls."""
+    st.divider()
+    st.subheader("Database Management")
+
+    st.session_state.setdefault('reset_state', "idle")
+
+    st.button("⚠️ Reset Database", key="reset_db_button_main", on_click=_set_reset_state, args=("confirming",))
+
+    # Display confirmation UI while waiting for the user's decision
+    if st.session_state.reset_state == "confirming":
+        st.warning("This action will archive the current database and initialize a new, empty one. This cannot be undone.")
+
+        # Use columns for a cleaner layout of confirmation buttons
+        col1, col2, col_spacer = st.columns([1, 1, 5]) 
+        with col1:
+            st.button("✅ Confirm Reset", key="confirm_reset_action", on_click=_set_reset_state, args=("confirmed",))
+        with col2:
+            st.button("❌ Cancel", key="cancel_reset_action", on_click=_cancel_reset)
+
+    # Perform the reset in the same run as the "Confirm Reset" click
+    elif st.session_state.reset_state == "confirmed":
+        try:
+            success, message = job_tracker_controller.reset_database()
+            if success:
+                logger.info("Database reset successful: %s", message)
+
+                # 1. Drop every cached resource and data entry so the rerun rebuilds
+                #    the session/controllers against the fresh database
+                st.cache_resource.clear()
+                st.cache_data.clear()
+                # Other sessions keep their frame until the version moves
+                bump_applications_version()
+
+                # 2. Clear ALL session state except the restart flag
+                keys_to_keep = {'force_restart_after_reset'}
+                keys_to_delete = [key for key in st.session_state.keys() if key not in keys_to_keep]
+                for key in keys_to_delete:
+                    del st.session_state[key]
+
+                # 3. Set restart flag and rerun once; the top of the script reinitializes everything
+                st.session_state.force_restart_after_reset = True
+                st.rerun()
+            else:
+                st.error(f"Database reset failed: {message}")
+                logger.error("Database reset failed: %s", message)
+        except Exception as e:
+            st.error(f"An error occurred during database reset: {e}")
+            logger.error("Error resetting database from main page UI: %s", e, exc_info=True)
+        finally:
+            # CRITICAL: Always return to idle after the attempt
+            st.session_state.reset_state = "idle"
+            # No rerun here on failure, so user can see the error message.
+            # If a rerun is desired even on failure, it might clear the error too quickly.
+
+
+render_database_management_section()
@@ -1,5 +1,5 @@
 """Unified controller layer for job posting and application operations."""
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
 
 from core.services.job_tracker_service import JobTrackerService
@@ -185,6 +185,33 @@ class JobTrackerController:
             "message": "Application created successfully"
         }
 
+    def create_job_posting_with_application(
+        self,
+        db: Session,
+        job_posting: Dict[str, Any],
+        application: Dict[str, Any],
+        status: str,
+        source_text: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Create a job posting, its application and initial status atomically."""
+        application_record = self.service.add_job_posting_with_application(
+            db=db,
+            job_posting=job_posting,
+            application=application,
+            status=status,
+            source_text=source_text
+        )
+
+        if not application_record:
+            return {"success": False, "message": "Failed to create job posting and application"}
+
+        return {
+            "success": True,
+            "job_posting_id": application_record.job_posting_id,
+            "application_id": application_record.id,
+            "message": "Job posting and application created successfully"
+        }
+
     def get_application_list(self, db: Session) -> Dict[str, Any]:
         """Get a list of all applications with their latest status."""
         applications = self.service.get_all_applications_with_details(db)
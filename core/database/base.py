@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from pathlib import Path
 from typing import Generator
@@ -8,6 +8,18 @@ def get_database_path() -> Path:
     """Get the database file path."""
     return Path(__file__).parent.parent.parent / "data" / "job_applications.db"
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLite pragmas to every new connection."""
+    cursor = dbapi_connection.cursor()
+    # WAL lets the display refresh read while a save commits, and NORMAL sync
+    # avoids an fsync on every commit (still durable across app crashes)
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+    cursor.close()
+
 def create_database_engine():
     """Create and return the database engine."""
     DATABASE_PATH = get_database_path()
@@ -16,7 +28,9 @@ def create_database_engine():
     # Ensure the directory exists
     DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
     
-    return create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
 
 # Create the database URL - using the same path as before
 DATABASE_PATH = get_database_path()
@@ -1,7 +1,6 @@
 """Basic CRUD operations for the job tracker database."""
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from typing import Optional, List, Dict, Any
+from typing import Optional, List
 from . import models, schemas
 
 def init_db(db: Session) -> None:
@@ -90,6 +89,31 @@ def delete_application(db: Session, application_id: int) -> bool:
         return True
     return False
 
+def create_job_posting_with_application(
+    db: Session,
+    job_posting: schemas.JobPostingCreate,
+    application: schemas.ApplicationCreateWithJobPosting,
+    status: str,
+    source_text: Optional[str] = None
+) -> models.Application:
+    """Create a job posting, its application and the initial status in a single transaction."""
+    db_job_posting = models.JobPosting(**job_posting.model_dump())
+    db_application = models.Application(
+        job_posting=db_job_posting,
+        **application.model_dump()
+    )
+    models.ApplicationStatus(application=db_application, status=status, source_text=source_text)
+    
+    # The application and status rows are added through the relationship cascades
+    db.add(db_job_posting)
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(db_application)
+    return db_application
+
 # Status history operations
 def create_application_status(db: Session, status: schemas.ApplicationStatusCreate) -> models.ApplicationStatus:
     """Create a new status history record."""
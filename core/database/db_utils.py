@@ -1,10 +1,12 @@
+import logging
 import os
 import shutil
 from datetime import datetime
-from urllib.parse import urlparse, unquote
 
 from core.database.base import DATABASE_URL # Changed SQLALCHEMY_DATABASE_URL to DATABASE_URL
 
+logger = logging.getLogger(__name__)
+
 TRASH_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'trash'))
 
 def get_database_file_path() -> str:
@@ -44,7 +46,7 @@ def archive_database_file() -> tuple[bool, str]:
 
         if not os.path.exists(TRASH_DIR):
             os.makedirs(TRASH_DIR)
-            print(f"Created trash directory: {TRASH_DIR}")
+            logger.info("Created trash directory: %s", TRASH_DIR)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         db_filename = os.path.basename(db_path)
@@ -52,6 +54,12 @@ def archive_database_file() -> tuple[bool, str]:
         archive_path = os.path.join(TRASH_DIR, archive_filename)
 
         shutil.move(db_path, archive_path)
+
+        # Move the WAL sidecar files too, so a new database created at the same
+        # path never picks up pages from the archived one
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                shutil.move(db_path + suffix, archive_path + suffix)
         return True, f"Database file '{db_filename}' archived to '{archive_path}'"
     except Exception as e:
         return False, f"Error archiving database file: {e}"
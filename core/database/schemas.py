@@ -80,8 +80,8 @@ class JobPosting(JobPostingBase):
         from_attributes = True
 
 # Base schemas for application
-class ApplicationBase(BaseModel):
-    job_posting_id: int
+class ApplicationFields(BaseModel):
+    """Application fields other than the job posting it belongs to"""
     submission_method: Optional[str] = None
     date_submitted: Optional[str] = None
     resume_file_path: Optional[str] = None
@@ -90,9 +90,16 @@ class ApplicationBase(BaseModel):
     additional_questions: Optional[str] = None
     notes: Optional[str] = None
 
+class ApplicationBase(ApplicationFields):
+    job_posting_id: int
+
 class ApplicationCreate(ApplicationBase):
     pass
 
+class ApplicationCreateWithJobPosting(ApplicationFields):
+    """Schema for creating an application together with its job posting - the link is set on insert"""
+    pass
+
 class ApplicationUpdate(BaseModel):
     """Schema for updating applications - all fields optional"""
     job_posting_id: Optional[int] = None
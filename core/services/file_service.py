@@ -1,11 +1,16 @@
 import hashlib
-import os
+import secrets
 from pathlib import Path
 from typing import Optional, Tuple
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Anything other than word characters, spaces and dashes is unsafe in a file name
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w \-]')
+MAX_FILENAME_PREFIX_LEN = 50
+
 class FileService:
     """Service for handling file operations in the JobAssistant application."""
     
@@ -32,10 +37,10 @@ class FileService:
             # Create main data directory
             if not data_dir.exists():
                 data_dir.mkdir(parents=True, exist_ok=True)
-                logger.info(f"Created data directory at: {data_dir}")
+                logger.info("Created data directory at: %s", data_dir)
                 message = f"Data directory created successfully at: {data_dir}"
             else:
-                logger.info(f"Data directory already exists at: {data_dir}")
+                logger.info("Data directory already exists at: %s", data_dir)
                 message = f"Data directory already exists at: {data_dir}"
             
             # Create subdirectories
@@ -44,7 +49,7 @@ class FileService:
                 subdir_path = data_dir / subdir
                 if not subdir_path.exists():
                     subdir_path.mkdir(parents=True, exist_ok=True)
-                    logger.info(f"Created subdirectory: {subdir_path}")
+                    logger.info("Created subdirectory: %s", subdir_path)
             
             return True, message
             
@@ -69,16 +74,23 @@ class FileService:
         if uploaded_file_obj is None:
             return None
         try:
-            file_bytes = uploaded_file_obj.getvalue()
-            sha256_hash = hashlib.sha256(file_bytes).hexdigest()
-            file_extension = Path(uploaded_file_obj.name).suffix
-            save_path = self.data_files_dir / f"{sha256_hash}{file_extension}"
-            
-            with open(save_path, "wb") as f:
-                f.write(file_bytes)
+            # Hash and write through a view of the upload buffer instead of a getvalue() copy
+            with uploaded_file_obj.getbuffer() as file_buffer:
+                sha256_hash = hashlib.sha256(file_buffer).hexdigest()
+                file_extension = Path(uploaded_file_obj.name).suffix
+                save_path = self.data_files_dir / f"{sha256_hash}{file_extension}"
+                
+                # The name is the content hash, so an existing file of the same size
+                # already holds these bytes; skip rewriting re-uploads
+                if save_path.exists() and save_path.stat().st_size == file_buffer.nbytes:
+                    logger.info("File %s already saved, skipping write", save_path.name)
+                    return str(save_path)
+                
+                with open(save_path, "wb") as f:
+                    f.write(file_buffer)
             return str(save_path)
         except Exception as e:
-            print(f"Error saving file: {e}")
+            logger.error("Error saving file: %s", e)
             return None
 
     def get_file_hash(self, file_path: str) -> Optional[str]:
@@ -87,56 +99,43 @@ class FileService:
         Returns the hex digest of the hash, or None if an error occurs.
         """
         try:
+            # file_digest streams the file through OpenSSL instead of reading it into memory
             with open(file_path, "rb") as f:
-                file_bytes = f.read()
-                sha256_hash = hashlib.sha256(file_bytes).hexdigest()
-                return sha256_hash
+                return hashlib.file_digest(f, "sha256").hexdigest()
         except Exception as e:
-            print(f"Error hashing file {file_path}: {e}")
+            logger.error("Error hashing file %s: %s", file_path, e)
             return None
 
     def save_cover_letter(self, cover_letter_content: str, filename_prefix: str) -> Optional[str]:
         """
         Saves cover letter content to a file in the cover letters directory.
-        The filename will be <filename_prefix>_cover_letter.txt.
+        The filename will be <filename_prefix>_cover_letter.txt, with a random
+        suffix if that name is already taken.
         Returns the path to the saved file, or None if saving failed.
         """
         if not cover_letter_content or not filename_prefix:
             return None
         try:
-            # Sanitize filename_prefix to remove characters not suitable for filenames
-            safe_prefix = "".join(c if c.isalnum() or c in (' ', '_', '-') else '_' for c in filename_prefix).strip()
-            safe_prefix = safe_prefix.replace(' ', '_')  # Replace spaces with underscores
-            
-            # Ensure the prefix is not too long (optional, but good practice)
-            max_prefix_len = 50 
-            if len(safe_prefix) > max_prefix_len:
-                safe_prefix = safe_prefix[:max_prefix_len]
-
-            # Remove any trailing underscores that might result from sanitization
-            while safe_prefix.endswith('_'):
-                safe_prefix = safe_prefix[:-1]
-            
-            if not safe_prefix:  # If prefix becomes empty after sanitization
-                safe_prefix = "cover_letter"
-
-            filename = f"{safe_prefix}_cover_letter.txt"
-            save_path = self.cover_letters_dir / filename
-            
-            # Ensure filename is unique if it already exists by appending a number
-            counter = 1
-            original_save_path = save_path
-            while save_path.exists():
-                filename = f"{safe_prefix}_cover_letter_{counter}.txt"
-                save_path = self.cover_letters_dir / filename
-                counter += 1
-                if counter > 100:  # Safety break to prevent infinite loop
-                    print(f"Error: Could not find a unique filename for {original_save_path.name} after 100 attempts.")
-                    return None
+            # Sanitize filename_prefix in a single regex pass: keep word characters,
+            # spaces and dashes, use underscores for spaces, cap the length and
+            # drop trailing underscores left by sanitization
+            safe_prefix = _UNSAFE_FILENAME_CHARS.sub('_', filename_prefix).strip().replace(' ', '_')
+            safe_prefix = safe_prefix[:MAX_FILENAME_PREFIX_LEN].rstrip('_') or "cover_letter"
 
-            with open(save_path, "w", encoding="utf-8") as f:
-                f.write(cover_letter_content)
+            # Exclusive create claims a free name in one open() call; on a clash
+            # fall back to a random suffix instead of probing numbered names
+            save_path = self.cover_letters_dir / f"{safe_prefix}_cover_letter.txt"
+            for _ in range(3):
+                try:
+                    with open(save_path, "x", encoding="utf-8") as f:
+                        f.write(cover_letter_content)
+                    break
+                except FileExistsError:
+                    save_path = self.cover_letters_dir / f"{safe_prefix}_cover_letter_{secrets.token_hex(4)}.txt"
+            else:
+                logger.error("Could not find a unique filename for %s_cover_letter.txt", safe_prefix)
+                return None
             return str(save_path)
         except Exception as e:
-            print(f"Error saving cover letter: {e}")
+            logger.error("Error saving cover letter: %s", e)
             return None
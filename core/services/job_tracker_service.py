@@ -1,8 +1,7 @@
 """Unified service layer for job posting and application operations."""
-from datetime import datetime
 from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from sqlalchemy import func, and_
 
 from ..database import models, schemas, crud
 from ..database.db_utils import archive_database_file # Added import
@@ -134,6 +133,23 @@ class JobTrackerService:
         
         return application
 
+    @staticmethod
+    def add_job_posting_with_application(
+        db: Session,
+        job_posting: Dict[str, Any],
+        application: Dict[str, Any],
+        status: str,
+        source_text: Optional[str] = None,
+    ) -> Optional[models.Application]:
+        """Add a job posting, its application and initial status in one transaction."""
+        return crud.create_job_posting_with_application(
+            db,
+            schemas.JobPostingCreate(**job_posting),
+            schemas.ApplicationCreateWithJobPosting(**application),
+            status=status,
+            source_text=source_text
+        )
+
     @staticmethod
     def get_applications_with_latest_status(db: Session) -> List[Dict[str, Any]]:
         """Get all applications with their latest status."""
@@ -198,41 +214,53 @@ class JobTrackerService:
     @staticmethod
     def get_all_applications_with_details(db: Session) -> List[Dict[str, Any]]:
         """Get all applications with job posting details and latest status."""
-        applications = (
-            db.query(models.Application)
-            .options(
-                joinedload(models.Application.job_posting),
-                joinedload(models.Application.status_history)
+        # Rank each application's status history so only the latest record is joined
+        latest_status = (
+            db.query(
+                models.ApplicationStatus.application_id,
+                models.ApplicationStatus.status,
+                models.ApplicationStatus.created_at,
+                func.row_number().over(
+                    partition_by=models.ApplicationStatus.application_id,
+                    order_by=(
+                        models.ApplicationStatus.created_at.desc(),
+                        models.ApplicationStatus.id.desc()
+                    )
+                ).label("status_rank")
             )
-            .all()
+            .subquery()
         )
 
-        results = []
-        for app in applications:
-            # Get latest status
-            latest_status = None
-            latest_timestamp = None
-            if app.status_history:
-                latest_status_record = max(app.status_history, key=lambda x: x.created_at)
-                latest_status = latest_status_record.status
-                latest_timestamp = latest_status_record.created_at
-
-            result = {
-                "application_id": app.id,
-                "job_title": app.job_posting.title,
-                "job_company": app.job_posting.company,
-                "job_location": app.job_posting.location,
-                "date_submitted": app.date_submitted,
-                "resume_file_path": app.resume_file_path,
-                "cover_letter_file_path": app.cover_letter_file_path,
-                "submission_method": app.submission_method,
-                "current_status": latest_status,
-                "status_timestamp": latest_timestamp,
-                "notes": app.notes
-            }
-            results.append(result)
+        # Select only the columns the list view needs; descriptions, cover letter
+        # text and full status history are loaded on demand per application.
+        rows = (
+            db.query(
+                models.Application.id.label("application_id"),
+                models.JobPosting.title.label("job_title"),
+                models.JobPosting.company.label("job_company"),
+                models.JobPosting.location.label("job_location"),
+                models.JobPosting.skills.label("job_skills"),
+                models.JobPosting.tags.label("job_tags"),
+                models.Application.date_submitted,
+                models.Application.resume_file_path,
+                models.Application.cover_letter_file_path,
+                models.Application.submission_method,
+                latest_status.c.status.label("current_status"),
+                latest_status.c.created_at.label("status_timestamp")
+            )
+            .join(models.Application.job_posting)
+            .outerjoin(
+                latest_status,
+                and_(
+                    latest_status.c.application_id == models.Application.id,
+                    latest_status.c.status_rank == 1
+                )
+            )
+            .order_by(models.Application.id)
+            .all()
+        )
 
-        return results
+        return [dict(row._mapping) for row in rows]
 
     @staticmethod
     def get_full_application_details(db: Session, application_id: int) -> Optional[Dict[str, Any]]:
@@ -338,6 +366,9 @@ class JobTrackerService:
         # This is crucial before trying to move/delete the file.
         # The calling scope (e.g., controller or UI) should handle getting a new session if needed after reset.
         db.close() # Close the session passed to this service method.
+        # Also close pooled connections so SQLite checkpoints the WAL into the
+        # database file before it is moved.
+        engine.dispose()
 
         archived_ok, archive_message = archive_database_file()
         if not archived_ok:
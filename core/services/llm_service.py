@@ -3,34 +3,67 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 import requests
-from llama_cpp import Llama
+from requests.adapters import HTTPAdapter
 import streamlit as st
 import json
+import re
+import threading
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Constants
 MODELS_DIR = Path("core/models")
 DEFAULT_MODEL = "Qwen3-8B-Q4_K_M.gguf"
 OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_REQUEST_TIMEOUT = 2  # seconds, for quick metadata calls such as /api/tags
+OLLAMA_MODELS_TTL = 300  # seconds to reuse the installed model list
+OLLAMA_WARMUP_TIMEOUT = 120  # seconds, loading weights for a large model can be slow
+OLLAMA_KEEP_ALIVE = 300  # seconds Ollama keeps a warmed-up model loaded (its default)
+
+# <think>...</think> reasoning blocks emitted by Qwen3-style models
+THINK_TAG_PATTERN = re.compile(r'<think>.*?</think>', re.DOTALL)
+
+# One pooled HTTP session for all Ollama calls, so requests reuse keep-alive
+# connections instead of opening a new one each time
+_ollama_session = requests.Session()
+_ollama_session.mount(OLLAMA_BASE_URL, HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
+# Process-wide copy of the last successful model listing. Unlike st.cache_data
+# it survives st.cache_data.clear() (called by the database reset).
+_ollama_models_cache: Dict[str, Any] = {"fetched_at": None, "models": []}
 
 class LLMService:
     """Service for managing LLM operations and backends."""
     
     @staticmethod
+    @st.cache_data(ttl=OLLAMA_MODELS_TTL, max_entries=1, show_spinner=False)
     def get_ollama_models():
-        """Helper function to get available Ollama models."""
+        """Helper function to get available Ollama models.
+
+        Cached so sidebar reruns don't hit the Ollama server; call
+        ``LLMService.refresh_ollama_models()`` to force a refresh.
+        """
+        fetched_at = _ollama_models_cache["fetched_at"]
+        if fetched_at is not None and time.monotonic() - fetched_at < OLLAMA_MODELS_TTL:
+            return list(_ollama_models_cache["models"])
         try:
-            response = requests.get(f"{OLLAMA_BASE_URL}/api/tags")
+            response = _ollama_session.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=OLLAMA_REQUEST_TIMEOUT)
             if response.status_code == 200:
-                models = response.json().get('models', [])
-                return [model['name'] for model in models]
+                models = [model['name'] for model in response.json().get('models', [])]
+                _ollama_models_cache.update(fetched_at=time.monotonic(), models=models)
+                return models
             return []
-        except requests.RequestException:
+        except requests.RequestException as e:
+            logger.debug("Could not list Ollama models: %s", e)
             return []
 
+    @staticmethod
+    def refresh_ollama_models():
+        """Drop both model list caches so the next lookup queries Ollama again."""
+        _ollama_models_cache.update(fetched_at=None, models=[])
+        LLMService.get_ollama_models.clear()
+
 # Abstract base class for LLM backends
 class LLMBackend(ABC):
     @abstractmethod
@@ -48,13 +81,55 @@ class LLMBackend(ABC):
         """Get information about the currently loaded model."""
         pass
 
+def _warm_up_llama_model(model, model_lock: threading.Lock) -> None:
+    """Run a one-token completion so the weights are paged in and compute buffers allocated."""
+    try:
+        with model_lock:
+            model.create_completion(" ", max_tokens=1)
+        logger.info("llama.cpp model warmed up")
+    except Exception as e:
+        logger.warning("llama.cpp warm-up failed: %s", e)
+
+@st.cache_resource(show_spinner=False)
+def load_llama_model(model_path: str):
+    """
+    Load a GGUF model once per process.
+
+    Every session and rerun shares the returned handle instead of loading
+    its own copy of the weights. The handle is shared - do not mutate it.
+    Returns the model and the lock that must be held around every call to
+    it, since a llama.cpp context can't run two completions at once.
+    """
+    # Imported here so the llama.cpp extension only loads when this backend is used
+    from llama_cpp import Llama
+    model = Llama(
+        model_path=model_path,
+        n_gpu_layers=-1,  # Use all GPU layers
+        n_ctx=4096,      # Context size
+        n_batch=512,     # Prompt tokens evaluated per batch
+        use_mmap=True,   # Page weights in from the file instead of copying them
+        verbose=True,    # Enable verbose logging
+        logits_all=False, # Don't log all logits (performance)
+        echo=False,      # Don't echo input in output
+        last_n_tokens_size=64  # Size of last_n_tokens buffer
+    )
+    model_lock = threading.Lock()
+    # Warm up in the background so the first analysis doesn't pay for it
+    threading.Thread(
+        target=_warm_up_llama_model,
+        args=(model, model_lock),
+        name=f"llama-warm-up-{Path(model_path).name}",
+        daemon=True
+    ).start()
+    return model, model_lock
+
 class LlamaCppBackend(LLMBackend):
     def __init__(self, model_path: str = str(MODELS_DIR / DEFAULT_MODEL)):
         self.model_path = model_path
-        logger.info(f"Initializing LlamaCpp backend with model: {model_path}")
-        # Move model to session state
-        if "llm_model" not in st.session_state:
-            st.session_state.llm_model = None
+        logger.info("Initializing LlamaCpp backend with model: %s", model_path)
+        # Shared handle and its call lock from load_llama_model, set by initialize_model
+        self.model = None
+        self._model_lock = None
         # Initialize stop flag for interrupting generation
         if "llm_stop_generation" not in st.session_state:
             st.session_state.llm_stop_generation = False
@@ -62,49 +137,40 @@ class LlamaCppBackend(LLMBackend):
     def initialize_model(self) -> bool:
         try:
             logger.info("Loading model...")
-            # Initialize model in session state if not already loaded
-            if st.session_state.llm_model is None:
-                st.session_state.llm_model = Llama(
-                    model_path=self.model_path,
-                    n_gpu_layers=-1,  # Use all GPU layers
-                    n_ctx=4096,      # Context size
-                    verbose=True,    # Enable verbose logging
-                    logits_all=False, # Don't log all logits (performance)
-                    echo=False,      # Don't echo input in output
-                    last_n_tokens_size=64  # Size of last_n_tokens buffer
-                )
+            self.model, self._model_lock = load_llama_model(self.model_path)
             logger.info("Model loaded successfully")
             return True
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             return False
 
     def generate_response(self, messages: List[Dict[str, str]], **kwargs) -> Optional[str]:
-        if st.session_state.llm_model is None:
+        if self.model is None:
             logger.error("Model not initialized")
             return None
 
         try:
             logger.info("Generating response...")
-            response = st.session_state.llm_model.create_chat_completion(
-                messages=messages,
-                max_tokens=kwargs.get('max_tokens', 2000),
-                temperature=kwargs.get('temperature', 0.7),
-                top_p=kwargs.get('top_p', 0.8),
-                top_k=kwargs.get('top_k', 20),
-                presence_penalty=kwargs.get('presence_penalty', 1.5),
-            )
+            with self._model_lock:
+                response = self.model.create_chat_completion(
+                    messages=messages,
+                    max_tokens=kwargs.get('max_tokens', 2000),
+                    temperature=kwargs.get('temperature', 0.7),
+                    top_p=kwargs.get('top_p', 0.8),
+                    top_k=kwargs.get('top_k', 20),
+                    presence_penalty=kwargs.get('presence_penalty', 1.5),
+                )
             
             if response and 'choices' in response and response['choices']:
                 return response['choices'][0]['message']['content'].strip()
             return None
         except Exception as e:
-            logger.error(f"Error generating response: {e}")
+            logger.error("Error generating response: %s", e)
             return None
 
     def generate_response_streaming(self, messages: List[Dict[str, str]], **kwargs) -> Optional[str]:
         """Generate response with streaming and interruption support."""
-        if st.session_state.llm_model is None:
+        if self.model is None:
             logger.error("Model not initialized")
             return None
 
@@ -118,37 +184,35 @@ class LlamaCppBackend(LLMBackend):
             # Get callback function for UI updates (if provided)
             update_callback = kwargs.get('update_callback')
             
-            # Create streaming completion
-            stream = st.session_state.llm_model.create_chat_completion(
-                messages=messages,
-                max_tokens=kwargs.get('max_tokens', 2000),
-                temperature=kwargs.get('temperature', 0.6),
-                top_p=kwargs.get('top_p', 0.95),
-                top_k=kwargs.get('top_k', 20),
-                presence_penalty=kwargs.get('presence_penalty', 1.5),
-                stream=True
-            )
-            
-            for chunk in stream:
-                # Check if generation should be stopped
-                if st.session_state.get("llm_stop_generation", False):
-                    logger.info("Generation interrupted by user")
-                    return full_response.strip() if full_response else None
-                    
-                if chunk and 'choices' in chunk and chunk['choices']:
-                    delta = chunk['choices'][0].get('delta', {})
-                    if 'content' in delta:
-                        content = delta['content']
-                        full_response += content
-                        
-                        # Call UI update callback if provided
-                        if update_callback:
-                            filtered_response = self._filter_thinking_process(full_response)
-                            update_callback(filtered_response, is_complete=False)
-                        
-                        # Small delay to allow UI updates
-                        import time
-                        time.sleep(0.05)
+            # Hold the model for the whole stream; chunks are computed as they are read
+            with self._model_lock:
+                # Create streaming completion
+                stream = self.model.create_chat_completion(
+                    messages=messages,
+                    max_tokens=kwargs.get('max_tokens', 2000),
+                    temperature=kwargs.get('temperature', 0.6),
+                    top_p=kwargs.get('top_p', 0.95),
+                    top_k=kwargs.get('top_k', 20),
+                    presence_penalty=kwargs.get('presence_penalty', 1.5),
+                    stream=True
+                )
+
+                for chunk in stream:
+                    # Check if generation should be stopped
+                    if st.session_state.get("llm_stop_generation", False):
+                        logger.info("Generation interrupted by user")
+                        return full_response.strip() if full_response else None
+
+                    if chunk and 'choices' in chunk and chunk['choices']:
+                        delta = chunk['choices'][0].get('delta', {})
+                        if 'content' in delta:
+                            content = delta['content']
+                            full_response += content
+
+                            # Call UI update callback if provided
+                            if update_callback:
+                                filtered_response = self._filter_thinking_process(full_response)
+                                update_callback(filtered_response, is_complete=False)
             
             # Final callback with complete response
             if update_callback and full_response:
@@ -158,14 +222,13 @@ class LlamaCppBackend(LLMBackend):
             return full_response.strip() if full_response else None
             
         except Exception as e:
-            logger.error(f"Error in streaming generation: {e}")
+            logger.error("Error in streaming generation: %s", e)
             return None
 
     def _filter_thinking_process(self, text: str) -> str:
         """Remove thinking process tags from the response text."""
-        import re
         # Remove <think>...</think> tags and their content
-        filtered = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL)
+        filtered = THINK_TAG_PATTERN.sub('', text)
         return filtered.strip()
 
     def stop_generation(self):
@@ -177,58 +240,87 @@ class LlamaCppBackend(LLMBackend):
         return {
             "backend": "llama.cpp",
             "model_path": self.model_path,
-            "status": "loaded" if st.session_state.get("llm_model") is not None else "not loaded"
+            "status": "loaded" if self.model is not None else "not loaded"
         }
 
+def _warm_up_ollama_model(model_name: str) -> None:
+    """
+    Load an Ollama model into memory.
+
+    A generate request without a prompt makes Ollama load the weights and
+    return immediately, so the user's first real request only pays for prefill.
+    """
+    try:
+        response = _ollama_session.post(
+            f"{OLLAMA_BASE_URL}/api/generate",
+            json={"model": model_name, "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=OLLAMA_WARMUP_TIMEOUT
+        )
+        if response.status_code == 200:
+            logger.info("Ollama model %s warmed up", model_name)
+            return
+        logger.warning("Ollama warm-up for %s returned status %s", model_name, response.status_code)
+    except requests.RequestException as e:
+        logger.warning("Ollama warm-up for %s failed: %s", model_name, e)
+    # Allow a later initialization to try again
+    warm_up_ollama_model.clear(model_name)
+
+@st.cache_resource(ttl=OLLAMA_KEEP_ALIVE, show_spinner=False)
+def warm_up_ollama_model(model_name: str) -> threading.Thread:
+    """Start warming up an Ollama model in a background thread.
+
+    Loading the weights can take a while, so the app keeps rendering instead of
+    blocking startup on it. Cached for as long as Ollama keeps the model loaded
+    after the warm-up, so a later initialization warms it up again.
+    """
+    warm_up_thread = threading.Thread(
+        target=_warm_up_ollama_model,
+        args=(model_name,),
+        name=f"ollama-warm-up-{model_name}",
+        daemon=True
+    )
+    warm_up_thread.start()
+    return warm_up_thread
+
 class OllamaBackend(LLMBackend):
     def __init__(self, model_name: str = ""):
         self.model_name = model_name
-        logger.info(f"Initializing Ollama backend with model: {model_name}")
+        # Result of the last initialize_model() check; None until it has run
+        self._verified: Optional[bool] = None
+        logger.info("Initializing Ollama backend with model: %s", model_name)
 
     def initialize_model(self) -> bool:
+        self._verified = self._verify_model()
+        return self._verified
+
+    def _verify_model(self) -> bool:
+        """Check that Ollama is reachable and has the selected model."""
         try:
             # Test connection to Ollama
-            response = requests.get(f"{OLLAMA_BASE_URL}/api/tags")
+            response = _ollama_session.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=OLLAMA_REQUEST_TIMEOUT)
             if response.status_code == 200:
                 # Check if selected model exists
                 models = [model['name'] for model in response.json().get('models', [])]
                 if self.model_name in models:
                     logger.info("Ollama model verified successfully")
+                    warm_up_ollama_model(self.model_name)
                     return True
                 else:
-                    logger.error(f"Model {self.model_name} not found in Ollama")
+                    logger.error("Model %s not found in Ollama", self.model_name)
                     return False
             return False
         except requests.RequestException as e:
-            logger.error(f"Error connecting to Ollama: {e}")
+            logger.error("Error connecting to Ollama: %s", e)
             return False
 
-    def generate_response(self, messages: List[Dict[str, str]], **kwargs) -> Optional[str]:
-        if not self.model_name:
-            logger.error("No model selected")
-            return None
+    def refresh(self) -> bool:
+        """Re-check the connection and model instead of reusing the last result."""
+        return self.initialize_model()
 
-        try:
-            logger.info("Generating response with Ollama...")
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/chat",
-                json={
-                    "model": self.model_name,
-                    "messages": messages,
-                    "options": {
-                        "temperature": kwargs.get('temperature', 0.7),
-                        "top_p": kwargs.get('top_p', 0.95)
-                    },
-                    "stream": False
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()['message']['content'].strip()
-            return None
-        except Exception as e:
-            logger.error(f"Error generating response with Ollama: {e}")
-            return None
+    def generate_response(self, messages: List[Dict[str, str]], **kwargs) -> Optional[str]:
+        # Read the reply as Ollama produces it instead of waiting for the server to
+        # buffer the whole completion into one payload; pass update_callback to render it live
+        return self.generate_response_streaming(messages, **kwargs)
 
     def generate_response_streaming(self, messages: List[Dict[str, str]], **kwargs) -> Optional[str]:
         """Generate response with streaming support for Ollama."""
@@ -242,8 +334,9 @@ class OllamaBackend(LLMBackend):
             # Get callback function for UI updates (if provided)
             update_callback = kwargs.get('update_callback')
             
-            # Make streaming request to Ollama
-            response = requests.post(
+            # Make streaming request to Ollama; leaving the block returns the
+            # connection to the session's pool, even on an early return or break
+            with _ollama_session.post(
                 f"{OLLAMA_BASE_URL}/api/chat",
                 json={
                     "model": self.model_name,
@@ -255,41 +348,36 @@ class OllamaBackend(LLMBackend):
                     "stream": True  # Enable streaming
                 },
                 stream=True  # Enable streaming response
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return None
-            
-            full_response = ""
-            
-            # Process streaming response line by line
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        # Parse JSON from each line
-                        chunk_data = json.loads(line.decode('utf-8'))
-                        
-                        # Extract content from the message
-                        if 'message' in chunk_data and 'content' in chunk_data['message']:
-                            content = chunk_data['message']['content']
-                            full_response += content
-                            
-                            # Call UI update callback if provided
-                            if update_callback:
-                                update_callback(full_response, is_complete=False)
-                            
-                            # Small delay to allow UI updates
-                            import time
-                            time.sleep(0.02)  # Smaller delay for Ollama as it's usually faster
-                        
-                        # Check if this is the final chunk
-                        if chunk_data.get('done', False):
-                            break
-                            
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Failed to parse JSON chunk: {e}")
-                        continue
+            ) as response:
+                if response.status_code != 200:
+                    logger.error("Ollama API error: %s", response.status_code)
+                    return None
+
+                full_response = ""
+
+                # Process streaming response line by line
+                for line in response.iter_lines():
+                    if line:
+                        try:
+                            # Parse JSON from each line
+                            chunk_data = json.loads(line.decode('utf-8'))
+
+                            # Extract content from the message
+                            if 'message' in chunk_data and 'content' in chunk_data['message']:
+                                content = chunk_data['message']['content']
+                                full_response += content
+
+                                # Call UI update callback if provided
+                                if update_callback:
+                                    update_callback(full_response, is_complete=False)
+
+                            # Check if this is the final chunk
+                            if chunk_data.get('done', False):
+                                break
+
+                        except json.JSONDecodeError as e:
+                            logger.warning("Failed to parse JSON chunk: %s", e)
+                            continue
             
             # Final callback with complete response
             if update_callback and full_response:
@@ -298,12 +386,15 @@ class OllamaBackend(LLMBackend):
             return full_response.strip() if full_response else None
             
         except Exception as e:
-            logger.error(f"Error in Ollama streaming generation: {e}")
+            logger.error("Error in Ollama streaming generation: %s", e)
             return None
 
     def get_model_info(self) -> Dict[str, str]:
+        # The sidebar asks on every rerun, so reuse the last check; see refresh()
+        if self._verified is None:
+            self.initialize_model()
         return {
             "backend": "ollama",
             "model": self.model_name,
-            "status": "connected" if self.initialize_model() else "not connected"
+            "status": "connected" if self._verified else "not connected"
         }
@@ -1,18 +1,29 @@
+import hashlib
+import json
 import logging
-from typing import Optional, List
-from langchain.callbacks.manager import CallbackManager
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Tuple
 from langchain_community.llms import LlamaCpp as LangChainLlama
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.globals import set_llm_cache
 from langchain_ollama import OllamaLLM
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel
+import streamlit as st
 
-from .llm_service import LLMBackend, LlamaCppBackend, OllamaBackend
-from ..database.schemas import JobPostingBase
+from .llm_service import LLMBackend, LlamaCppBackend, OllamaBackend, THINK_TAG_PATTERN, load_llama_model
 
 logger = logging.getLogger(__name__)
 
+# Recent analyses per (backend, model, description digest), shared by all sessions.
+# Covers the streaming path too, which bypasses LangChain's LLM cache.
+ANALYSIS_CACHE_SIZE = 64
+_analysis_cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
 # Import form classes to get field definitions
 try:
     from ..ui.forms import JobPostingForm, ApplicationForm, ApplicationStatusForm
@@ -53,38 +64,142 @@ class ParsedJobPostingData(BaseModel):
             }
         }
 
+# Output parser for analysis responses; stateless, so one instance serves every call
+ANALYSIS_PARSER = PydanticOutputParser(pydantic_object=ParsedJobPostingData)
+
+# strict=False accepts raw newlines inside strings, which models often emit
+_json_decoder = json.JSONDecoder(strict=False)
+
+def _find_json_object(text: str) -> Optional[str]:
+    """Return the first complete JSON object embedded in the text, if any."""
+    start = text.find('{')
+    while start != -1:
+        try:
+            # raw_decode matches the object in C and reports where it ends
+            _, end = _json_decoder.raw_decode(text, start)
+            return text[start:end]
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None
+
+def clear_analysis_cache() -> None:
+    """Forget every cached job description analysis."""
+    with _analysis_cache_lock:
+        _analysis_cache.clear()
+
+@st.cache_resource(show_spinner=False)
+def initialize_llm_cache() -> BaseCache:
+    """
+    Install the LangChain response cache once per process.
+
+    Repeating an analysis of the same description with the same model is
+    then answered from the cache instead of running the model again. The
+    cache is in memory only: the pinned langchain-core serializes a
+    Generation without its text, so a SQLiteCache would replay empty
+    responses. The streaming path bypasses it; see _analysis_cache.
+    """
+    cache = InMemoryCache()
+    set_llm_cache(cache)
+    return cache
+
+@st.cache_resource(show_spinner=False)
+def get_langchain_llm(backend_type: str, model: str):
+    """
+    Build the LangChain wrapper for a backend model once per process.
+
+    Keyed by primitive arguments so every session and rerun shares one warm
+    client per model instead of constructing (or reloading) it again.
+    The returned object is shared - do not mutate it.
+    """
+    if backend_type == "llama.cpp":
+        return LangChainLlama(
+            model_path=model,
+            n_gpu_layers=-1,
+            n_ctx=2048,
+            verbose=True,
+        )
+    if backend_type == "ollama":
+        return OllamaLLM(model=model)
+    return None
+
 class PromptService:
     """Service for AI-powered job description analysis using LangChain."""
     
+    # Shared by all instances; see _get_analysis_prompt
+    _analysis_prompt: Optional[PromptTemplate] = None
+    
     def __init__(self, base_backend: LLMBackend):
         self.base_backend = base_backend
-        self.langchain_llm = None
-        self._initialize_langchain()
+        self._langchain_llm = None
+        # Held around every call to the shared wrapper; see _initialize_langchain
+        self._langchain_llm_lock = nullcontext()
+
+    @property
+    def langchain_llm(self):
+        """LangChain wrapper for the base backend, created on first use."""
+        if self._langchain_llm is None:
+            self._initialize_langchain()
+        return self._langchain_llm
 
     def _initialize_langchain(self):
         """Initialize LangChain wrapper for the base backend."""
-        # Common callback manager for all backends
-        callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
-        
+        # The streaming path talks to the base backend directly, so the wrapper
+        # (a second copy of the model for llama.cpp) is only built when needed.
+        initialize_llm_cache()
         if isinstance(self.base_backend, LlamaCppBackend):
-            self.langchain_llm = LangChainLlama(
-                model_path=self.base_backend.model_path,
-                n_gpu_layers=-1,
-                n_ctx=2048,
-                callback_manager=callback_manager,
-                verbose=True,
-            )
+            self._langchain_llm = get_langchain_llm("llama.cpp", self.base_backend.model_path)
+            # The wrapper is shared by every session and a llama.cpp context can't
+            # run two completions at once; reuse the backend model's call lock
+            _, self._langchain_llm_lock = load_llama_model(self.base_backend.model_path)
         elif isinstance(self.base_backend, OllamaBackend):
-            self.langchain_llm = OllamaLLM(
-                model=self.base_backend.model_name,
-                callbacks=[StreamingStdOutCallbackHandler()],
+            self._langchain_llm = get_langchain_llm("ollama", self.base_backend.model_name)
+
+    def _analysis_cache_key(self, description: str) -> Tuple[str, str, str]:
+        """Key an analysis by backend, model and a short digest of the description."""
+        model = getattr(self.base_backend, "model_path", None) or getattr(self.base_backend, "model_name", "")
+        digest = hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest()
+        return type(self.base_backend).__name__, model, digest
+
+    def _get_cached_analysis(self, description: str) -> Optional[ParsedJobPostingData]:
+        """Return a previous analysis of this description by the same model, if any."""
+        key = self._analysis_cache_key(description)
+        with _analysis_cache_lock:
+            cached = _analysis_cache.get(key)
+            if cached is None:
+                return None
+            _analysis_cache.move_to_end(key)
+        logger.info("Using cached analysis for job description")
+        # A fresh model per hit so callers can't mutate the cached copy
+        return ParsedJobPostingData(**cached)
+
+    def _cache_analysis(self, description: str, parsed: Optional[ParsedJobPostingData]) -> Optional[ParsedJobPostingData]:
+        """Remember a successful analysis, evicting the least recently used one when full."""
+        if parsed is not None:
+            key = self._analysis_cache_key(description)
+            with _analysis_cache_lock:
+                _analysis_cache[key] = parsed.model_dump()
+                _analysis_cache.move_to_end(key)
+                while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    _analysis_cache.popitem(last=False)
+        return parsed
+
+    @classmethod
+    def _get_analysis_prompt(cls) -> PromptTemplate:
+        """Analysis prompt template, built once per process (the form fields it lists are static)."""
+        if cls._analysis_prompt is None:
+            cls._analysis_prompt = PromptTemplate(
+                template=cls._generate_analysis_prompt(),
+                input_variables=["description"],
+                partial_variables={"format_instructions": ANALYSIS_PARSER.get_format_instructions()}
             )
+        return cls._analysis_prompt
 
-    def _generate_analysis_prompt(self) -> str:
+    @classmethod
+    def _generate_analysis_prompt(cls) -> str:
         """Generate a dynamic prompt based on available form fields."""
         if JobPostingForm is None:
             # Fallback prompt if forms aren't available
-            return self._get_fallback_prompt()
+            return cls._get_fallback_prompt()
         
         job_fields = JobPostingForm.EXPECTED_FIELDS
         
@@ -137,7 +252,8 @@ class PromptService:
         """
         return prompt
 
-    def _get_fallback_prompt(self) -> str:
+    @staticmethod
+    def _get_fallback_prompt() -> str:
         """Fallback prompt when forms are not available."""
         return """Analyze the following job description and extract key information in a structured format.
 
@@ -173,20 +289,16 @@ class PromptService:
                 - stream: Enable streaming response (default: False)
                 - response_container: Streamlit container for live updates
         """
+        cached = self._get_cached_analysis(description)
+        if cached is not None:
+            return cached
+
         if not self.langchain_llm:
             logger.error("LangChain LLM not initialized")
             return None
 
-        parser = PydanticOutputParser(pydantic_object=ParsedJobPostingData)
-        
-        # Generate dynamic prompt based on form fields
-        template = self._generate_analysis_prompt()
-        
-        prompt = PromptTemplate(
-            template=template,
-            input_variables=["description"],
-            partial_variables={"format_instructions": parser.get_format_instructions()}
-        )
+        parser = ANALYSIS_PARSER
+        prompt = self._get_analysis_prompt()
         
         try:
             # Check if streaming is requested and backend supports it
@@ -203,7 +315,8 @@ class PromptService:
             else:
                 # Use the standard LangChain approach
                 chain = prompt | self.langchain_llm
-                result = chain.invoke({"description": description})
+                with self._langchain_llm_lock:
+                    result = chain.invoke({"description": description})
             
             # Handle None result from streaming (cancelled or failed)
             if result is None:
@@ -211,9 +324,9 @@ class PromptService:
                 return None
             
             # Parse the result using the helper method
-            return self._parse_response(result, parser)
+            return self._cache_analysis(description, self._parse_response(result, parser))
         except Exception as e:
-            logger.error(f"Error analyzing job description: {e}")
+            logger.error("Error analyzing job description: %s", e)
             return None
 
     def analyze_job_description_streaming(self, description: str, update_callback: Optional[callable] = None, **kwargs) -> Optional[ParsedJobPostingData]:
@@ -229,21 +342,17 @@ class PromptService:
             logger.error("LLM backend not initialized")
             return None
 
+        cached = self._get_cached_analysis(description)
+        if cached is not None:
+            return cached
+
         # Check if backend supports streaming
         if not hasattr(self.base_backend, 'generate_response_streaming'):
             logger.warning("Backend doesn't support streaming, falling back to regular generation")
             return self.analyze_job_description(description, **kwargs)
 
-        parser = PydanticOutputParser(pydantic_object=ParsedJobPostingData)
-        
-        # Generate dynamic prompt based on form fields
-        template = self._generate_analysis_prompt()
-        
-        prompt = PromptTemplate(
-            template=template,
-            input_variables=["description"],
-            partial_variables={"format_instructions": parser.get_format_instructions()}
-        )
+        parser = ANALYSIS_PARSER
+        prompt = self._get_analysis_prompt()
         
         formatted_prompt = prompt.format(description=description)
         messages = [{"role": "user", "content": formatted_prompt}]
@@ -263,43 +372,26 @@ class PromptService:
                 return None
             
             # Parse the final result
-            return self._parse_response(result, parser)
+            return self._cache_analysis(description, self._parse_response(result, parser))
             
         except Exception as e:
-            logger.error(f"Error in streaming analysis: {e}")
+            logger.error("Error in streaming analysis: %s", e)
             return None
 
     def _parse_response(self, result: str, parser) -> Optional[ParsedJobPostingData]:
         """Parse the response text into a ParsedJobPosting object."""
         try:
-            import re
             # Only remove the first thinking tag pair
-            cleaned_result = re.sub(r'<think>.*?</think>', '', result, count=1, flags=re.DOTALL)
+            cleaned_result = THINK_TAG_PATTERN.sub('', result, count=1)
             
-            # Find the outermost JSON object using a more robust pattern
-            def find_json(text):
-                stack = []
-                start = -1
-                for i, char in enumerate(text):
-                    if char == '{':
-                        if not stack:  # First opening brace
-                            start = i
-                        stack.append(char)
-                    elif char == '}':
-                        if stack and stack[-1] == '{':
-                            stack.pop()
-                            if not stack:  # Found matching outer braces
-                                return text[start:i+1]
-                return None
-
-            json_content = find_json(cleaned_result)
+            json_content = _find_json_object(cleaned_result)
             if json_content:
-                parsed_result = parser.parse(json_content.strip())
+                parsed_result = parser.parse(json_content)
                 return parsed_result
             else:
                 logger.warning("No valid JSON content found in response")
                 return None
                 
         except Exception as e:
-            logger.error(f"Error parsing response: {e}")
+            logger.error("Error parsing response: %s", e)
             return None
@@ -1,7 +1,17 @@
 """Base UI components and utilities."""
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
 import streamlit as st
 
+# Process-wide (st.cache_data is shared by every session), so a write in any
+# session invalidates the cached application data for all of them
+_applications_version = 0
+_applications_version_lock = threading.Lock()
+
+# Writes from outside this process (e.g. tests/populate_test_data.py) show up within this many seconds
+APPLICATIONS_CACHE_TTL = 300
+
 def show_validation_errors(errors: Dict[str, str]):
     """Display validation errors."""
     if errors:
@@ -27,6 +37,20 @@ def show_operation_result(result: Dict[str, Any], success_message: Optional[str]
         st.error(f"Operation failed: {result.get('message', 'Unknown error')}")
         return False
 
+def get_applications_version() -> int:
+    """Return the process-wide applications data version (used as a cache key)."""
+    return _applications_version
+
+def get_applications_cache_key() -> Tuple[int, int]:
+    """Return the key cached application data is stored under: the version and the current TTL window."""
+    return get_applications_version(), int(time.time() // APPLICATIONS_CACHE_TTL)
+
+def bump_applications_version():
+    """Invalidate cached application data after a successful write."""
+    global _applications_version
+    with _applications_version_lock:
+        _applications_version += 1
+
 def show_ai_assistance_indicator(field_name: str, has_ai_data: bool = False):
     """Show a small indicator that a field was AI-assisted."""
     if has_ai_data:
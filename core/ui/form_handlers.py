@@ -1,10 +1,10 @@
 """Centralized form handlers for the job tracker UI."""
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any
 from sqlalchemy.orm import Session
 import streamlit as st
 
 from .forms import JobPostingForm, ApplicationForm, ApplicationStatusForm
-from .base import show_validation_errors, show_operation_result
+from .base import show_validation_errors, show_operation_result, bump_applications_version
 from ..services.file_service import FileService
 
 
@@ -22,7 +22,10 @@ class BaseFormHandler:
     
     def show_result(self, result: Dict[str, Any], success_message: str) -> bool:
         """Show operation result and return success status."""
-        return show_operation_result(result, success_message)
+        success = show_operation_result(result, success_message)
+        if success:
+            bump_applications_version()
+        return success
 
 
 class JobPostingFormHandler(BaseFormHandler):
@@ -39,19 +42,26 @@ class JobPostingFormHandler(BaseFormHandler):
         
         return self.job_posting_controller.create_job_posting(
             db=self.db,
-            title=job_posting_data["title"],
-            company=job_posting_data["company"],
-            description=job_posting_data["description"],
-            location=job_posting_data["location"],
-            source_url=job_posting_data["source_url"],
-            date_posted=job_posting_data["date_posted"].isoformat() if job_posting_data["date_posted"] else None,
-            type=job_posting_data["type"],
-            seniority=job_posting_data["seniority"],
-            tags=job_posting_data["tags"],
-            skills=job_posting_data["skills"],
-            industry=job_posting_data["industry"]
+            **self.build_job_posting_fields(job_posting_data)
         )
     
+    @staticmethod
+    def build_job_posting_fields(job_posting_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map validated job posting form data to job posting fields."""
+        return {
+            "title": job_posting_data["title"],
+            "company": job_posting_data["company"],
+            "description": job_posting_data["description"],
+            "location": job_posting_data["location"],
+            "source_url": job_posting_data["source_url"],
+            "date_posted": job_posting_data["date_posted"].isoformat() if job_posting_data["date_posted"] else None,
+            "type": job_posting_data["type"],
+            "seniority": job_posting_data["seniority"],
+            "tags": job_posting_data["tags"],
+            "skills": job_posting_data["skills"],
+            "industry": job_posting_data["industry"]
+        }
+    
     def update_job_posting(self, job_posting_id: int, job_posting_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing job posting from form data."""
         if self.handle_validation_errors(JobPostingForm, job_posting_data):
@@ -86,6 +96,14 @@ class ApplicationFormHandler(BaseFormHandler):
         if self.handle_validation_errors(ApplicationForm, application_data):
             return {"success": False, "message": "Validation errors"}
         
+        return self.application_controller.create_application(
+            db=self.db,
+            job_posting_id=job_posting_id,
+            **self.build_application_fields(application_data)
+        )
+    
+    def build_application_fields(self, application_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Save uploaded files and map validated application form data to application fields."""
         # Handle file uploads
         resume_file_path = None
         cover_letter_file_path = None
@@ -96,17 +114,15 @@ class ApplicationFormHandler(BaseFormHandler):
         if application_data.get("cover_letter_file"):
             cover_letter_file_path = self.file_service.save_uploaded_file(application_data["cover_letter_file"])
         
-        return self.application_controller.create_application(
-            db=self.db,
-            job_posting_id=job_posting_id,
-            resume_file_path=resume_file_path,
-            cover_letter_file_path=cover_letter_file_path,
-            cover_letter_text=application_data["cover_letter_text"],
-            submission_method=application_data["submission_method"],
-            additional_questions=application_data["additional_questions"],
-            notes=application_data["notes"],
-            date_submitted=application_data["date_submitted"].isoformat()
-        )
+        return {
+            "resume_file_path": resume_file_path,
+            "cover_letter_file_path": cover_letter_file_path,
+            "cover_letter_text": application_data["cover_letter_text"],
+            "submission_method": application_data["submission_method"],
+            "additional_questions": application_data["additional_questions"],
+            "notes": application_data["notes"],
+            "date_submitted": application_data["date_submitted"].isoformat()
+        }
     
     def update_application(self, application_id: int, application_data: Dict[str, Any], 
                           new_resume=None, new_cover_letter=None, current_resume_path=None, 
@@ -172,25 +188,26 @@ class CombinedFormHandler:
                                          status_data: Dict[str, Any]) -> bool:
         """Handle the complete workflow: create job posting, application, and initial status."""
         
-        # Create job posting
-        jp_result = self.job_posting_handler.create_job_posting(job_posting_data)
-        if not self.job_posting_handler.show_result(jp_result, f"Job Posting '{job_posting_data['title']}' created"):
+        # Validate every form up front so nothing is written unless all of it can be
+        if self.job_posting_handler.handle_validation_errors(JobPostingForm, job_posting_data):
             return False
-        
-        # Create application
-        app_result = self.application_handler.create_application(
-            jp_result["job_posting_id"], 
-            application_data
-        )
-        if not self.application_handler.show_result(app_result, "Application created successfully"):
+        if self.application_handler.handle_validation_errors(ApplicationForm, application_data):
+            return False
+        if self.status_handler.handle_validation_errors(ApplicationStatusForm, status_data):
             return False
         
-        # Log initial status
-        status_result = self.status_handler.update_status(
-            app_result["application_id"], 
-            status_data
+        # Job posting, application and initial status are committed in one transaction
+        result = self.job_posting_handler.job_posting_controller.create_job_posting_with_application(
+            db=self.db,
+            job_posting=self.job_posting_handler.build_job_posting_fields(job_posting_data),
+            application=self.application_handler.build_application_fields(application_data),
+            status=status_data["status"],
+            source_text=status_data["source_text"]
+        )
+        success = self.job_posting_handler.show_result(
+            result,
+            f"Job Posting '{job_posting_data['title']}' and application created with status '{status_data['status']}'"
         )
-        success = self.status_handler.show_result(status_result, "Initial status logged successfully")
         
         if success:
             # Clear analysis result after successful submission
@@ -1,5 +1,5 @@
 """Reusable form renderer components for display and edit modes."""
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional
 import streamlit as st
 
 from .forms import JobPostingForm, ApplicationForm
@@ -3,17 +3,40 @@ from typing import Dict, Any, Optional, List
 import streamlit as st
 import pandas as pd
 from sqlalchemy.orm import Session
-from datetime import datetime
 
-from core.ui.displays import display_applications_table, display_status_history
-from core.ui.base import show_validation_errors, show_operation_result
+from core.ui.displays import display_status_history
 from core.ui.form_renderers import ReusableFormRenderer
-from core.services.file_service import FileService
 from core.ui.forms import JobPostingForm, ApplicationForm, ApplicationStatusForm
 from core.ui.form_handlers import CombinedFormHandler, ApplicationStatusFormHandler, JobPostingFormHandler, ApplicationFormHandler
 from core.ui.streaming_ui import create_streaming_display
+from core.ui.base import get_applications_cache_key
+from core.database.base import get_db_context
+
+def _clear_search() -> None:
+    """Reset the application search box."""
+    st.session_state.app_search = ""
+
+def _get_application_details(db: Session, application_id: int, job_tracker_controller) -> Dict[str, Any]:
+    """
+    Return the selected application's details, querying the database only
+    when the selection changes, a write bumps the applications data version
+    or the TTL window rolls over (same key as the applications table).
+    """
+    cache_key = (application_id, get_applications_cache_key())
+    cached = st.session_state.get("app_details_cache")
+    if cached and cached[0] == cache_key:
+        return cached[1]
+
+    result = job_tracker_controller.get_application_details(db, application_id)
+    if not result["success"]:
+        return {}
+    st.session_state.app_details_cache = (cache_key, result["details"])
+    return result["details"]
+
 
 # Render the database display section with tabs for applications and statistics.
+# Runs as a fragment so typing in the search box only reruns this section.
+@st.fragment
 def render_database_display_section(
     applications_df: pd.DataFrame,
     display_columns: List[str]
@@ -32,11 +55,6 @@ def render_database_display_section(
             # Create search bar with clear button
             search_col, clear_col = st.columns([4, 1])
             
-            # Check if clear button was clicked in previous run
-            if "clear_search_clicked" in st.session_state and st.session_state.clear_search_clicked:
-                st.session_state.app_search = ""
-                st.session_state.clear_search_clicked = False
-            
             with search_col:
                 search_term = st.text_input(
                     "Search applications",
@@ -47,35 +65,25 @@ def render_database_display_section(
                 )
             
             with clear_col:
-                if st.button("🗑️ Clear", key="clear_search", help="Clear search", use_container_width=True):
-                    st.session_state.clear_search_clicked = True
-                    st.rerun()
+                st.button("🗑️ Clear", key="clear_search", help="Clear search", use_container_width=True, on_click=_clear_search)
             
             # Perform search
             if search_term:
-                # Define searchable columns
-                search_columns = ['job_title', 'job_company', 'job_location', 'job_skills', 'job_tags', 'job_description']
+                # Case-fold the search terms once for case-insensitive search
+                search_terms = search_term.casefold().split()
                 
-                # Convert search term to lowercase for case-insensitive search
-                search_terms = search_term.lower().split()
+                # Initialize result mask aligned with the frame's index
+                search_mask = pd.Series(False, index=applications_df.index)
                 
-                # Initialize result mask
-                search_mask = pd.Series([False] * len(applications_df))
-                
-                # Search across all relevant columns
-                for col in search_columns:
-                    if col in applications_df.columns:
-                        # Convert column to string and lowercase
-                        col_text = applications_df[col].astype(str).str.lower()
-                        
-                        # Check if any search term is found in this column
-                        for term in search_terms:
-                            term_mask = col_text.str.contains(term, na=False, regex=False)
-                            search_mask |= term_mask
+                # '_haystack' holds each row's case-folded title, company, location,
+                # skills and tags, so every term is a single substring scan
+                for term in search_terms:
+                    search_mask |= applications_df['_haystack'].str.contains(term, na=False, regex=False)
                 
-                filtered_df = applications_df[search_mask].copy()
+                filtered_df = applications_df[search_mask]
             else:
-                filtered_df = applications_df.copy()
+                # Read-only below, so no defensive copy of the frame is needed
+                filtered_df = applications_df
             
             # Display search results
             total_count = len(applications_df)
@@ -104,6 +112,7 @@ def render_database_display_section(
                             'application_id': st.column_config.NumberColumn('ID', width='small'),
                             'job_title': st.column_config.TextColumn('Job Title', width='medium'),
                             'job_company': st.column_config.TextColumn('Company', width='medium'),
+                            'job_date_submitted': st.column_config.DateColumn(format='YYYY-MM-DD'),
                         }
                     )
                 else:
@@ -134,7 +143,7 @@ def render_main_action_tabs(
     
     with tab1:
         render_application_status_tab(
-            db, applications_df, job_tracker_controller
+            applications_df, job_tracker_controller
         )
     
     with tab2:
@@ -144,33 +153,51 @@ def render_main_action_tabs(
 
 
 # Main action, tab 1 - Render the application status update tab.
+# Runs as a fragment so picking an application or editing its forms only reruns
+# this tab; successful updates still rerun the whole app to refresh the table.
+@st.fragment
 def render_application_status_tab(
-    db: Session,
     applications_df: pd.DataFrame,
     job_tracker_controller
 ) -> None:
     """Render the application status update tab using reusable forms."""
+    # A fragment rerun skips the script's session, so each run opens and closes its own
+    with get_db_context() as db:
+        _render_application_status_tab(db, applications_df, job_tracker_controller)
+
+def _render_application_status_tab(
+    db: Session,
+    applications_df: pd.DataFrame,
+    job_tracker_controller
+) -> None:
+    """Render the application status tab's contents with the given session."""
     st.subheader("🔄 Update Application Status")
     
     if applications_df.empty:
         st.info("No applications available. Create an application first using the 'Add New Job Posting' tab.")
         return
     
-    # Application selection
-    app_id_options = applications_df['application_id'].tolist()
+    # Application selection (labels built once instead of filtering the frame per option)
+    app_labels = {
+        app_id: f"ID {app_id}: {title} at {company}"
+        for app_id, title, company in zip(
+            applications_df['application_id'].tolist(),
+            applications_df['job_title'].tolist(),
+            applications_df['job_company'].tolist()
+        )
+    }
     selected_app_id = st.selectbox(
         "Select Application to Update", 
-        options=app_id_options,
-        format_func=lambda x: f"ID {x}: {applications_df[applications_df['application_id']==x]['job_title'].iloc[0]} at {applications_df[applications_df['application_id']==x]['job_company'].iloc[0]}",
+        options=list(app_labels),
+        format_func=app_labels.get,
         key="main_app_selector",
         index=None,
         placeholder="Choose an application..."
     )
     
     if selected_app_id:
-        # Get application details
-        app_result = job_tracker_controller.get_application_details(db, selected_app_id)
-        app_details = app_result.get("details", {}) if app_result["success"] else {}
+        # Get application details (reused across reruns until a write bumps the version)
+        app_details = _get_application_details(db, selected_app_id, job_tracker_controller)
         
         # 1. Application Status Form on top with confirm button
         with st.expander("📊 Status History & Update", expanded=True):
@@ -243,8 +270,6 @@ def render_application_status_tab(
 # Main action, tab 2 - Render the AI job description analyzer section.
 def render_ai_job_description_analyzer(prompt_service) -> None:
     """Render the AI job description analyzer section."""
-    from .streaming_ui import create_streaming_display
-    
     st.subheader("🤖 AI Job Description Analyzer")
     
     # Check if AI service is available
@@ -343,17 +368,8 @@ def render_ai_job_description_analyzer(prompt_service) -> None:
                 # Store result for use in form prefilling
                 if result:
                     st.session_state.analysis_result = {
-                        "title": result.title,
-                        "company": getattr(result, 'company', ''),
-                        "description": job_description,
-                        "location": getattr(result, 'location', ''),
-                        "source_url": getattr(result, 'source_url', ''),
-                        "type": getattr(result, 'type', ''),
-                        "seniority": getattr(result, 'seniority', ''),
-                        "tags": getattr(result, 'tags', ''),
-                        "skills": getattr(result, 'skills', ''),
-                        "industry": getattr(result, 'industry', ''),
-                        "date_posted": getattr(result, 'date_posted', '')
+                        **result.model_dump(),
+                        "description": job_description
                     }
                     
                     # Clear the streaming container and show results
@@ -535,8 +551,7 @@ def render_application_management_section(
     """Render the section for managing an existing application."""
     st.subheader(f"Managing Application ID: {selected_app_id}")
     # Fetch full details for the selected application
-    result = job_tracker_controller.get_application_details(db, selected_app_id)
-    app_details = result.get("details") if result.get("success") else None
+    app_details = _get_application_details(db, selected_app_id, job_tracker_controller)
 
     if not app_details:
         st.error(f"Could not retrieve details for Application ID {selected_app_id}")
@@ -4,24 +4,26 @@ import streamlit as st
 from pathlib import Path
 
 from ..services.llm_service import LLMService, LlamaCppBackend, OllamaBackend
-from ..services.prompt_service import PromptService
+from ..services.prompt_service import PromptService, clear_analysis_cache, initialize_llm_cache
 
 # Constants
 MODELS_DIR = Path("core/models")
 
 
+# Session state defaults for LLM management
+_SESSION_DEFAULTS: Dict[str, Any] = {
+    "llm_backend": None,
+    "llm_initialized": False,
+    "selected_backend_type": "LlamaCpp",
+    "selected_model": None,
+    "prompt_service": None,
+}
+
+
 def _initialize_session_state():
     """Initialize session state variables for LLM management."""
-    if "llm_backend" not in st.session_state:
-        st.session_state.llm_backend = None
-    if "llm_initialized" not in st.session_state:
-        st.session_state.llm_initialized = False
-    if "selected_backend_type" not in st.session_state:
-        st.session_state.selected_backend_type = "LlamaCpp"
-    if "selected_model" not in st.session_state:
-        st.session_state.selected_model = None
-    if "prompt_service" not in st.session_state:
-        st.session_state.prompt_service = None
+    for key, value in _SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
 
 
 def _get_local_models() -> List[str]:
@@ -38,6 +40,33 @@ def _get_local_models() -> List[str]:
     return sorted(models)
 
 
+def _activate_model(backend_type: str, model_name: str) -> bool:
+    """Create and initialize a backend, making it the session's active model on success."""
+    # Create new backend instance
+    if backend_type == "Ollama":
+        backend = OllamaBackend(model_name)
+    else:  # LlamaCpp
+        backend = LlamaCppBackend(str(MODELS_DIR / model_name))
+    
+    if not backend.initialize_model():
+        return False
+    
+    st.session_state.llm_backend = backend
+    st.session_state.llm_initialized = True
+    st.session_state.selected_backend_type = backend_type
+    st.session_state.selected_model = model_name
+    st.session_state.prompt_service = PromptService(backend)
+    return True
+
+
+def _refresh_ollama() -> None:
+    """Re-read the installed Ollama models and re-check the active Ollama model."""
+    LLMService.refresh_ollama_models()
+    backend = st.session_state.get("llm_backend")
+    if isinstance(backend, OllamaBackend):
+        backend.refresh()
+
+
 def _reinitialize_model() -> bool:
     """Reinitialize the selected model."""
     try:
@@ -49,18 +78,8 @@ def _reinitialize_model() -> bool:
                 st.sidebar.error("Please select a model first")
                 return False
             
-            # Create new backend instance
-            if backend_type == "Ollama":
-                backend = OllamaBackend(selected_model)
-            else:  # LlamaCpp
-                model_path = MODELS_DIR / selected_model
-                backend = LlamaCppBackend(str(model_path))
-            
             # Initialize the backend
-            if backend.initialize_model():
-                st.session_state.llm_backend = backend
-                st.session_state.llm_initialized = True
-                st.session_state.prompt_service = PromptService(backend)
+            if _activate_model(backend_type, selected_model):
                 st.sidebar.success("Model initialized successfully!")
                 return True
             else:
@@ -183,6 +202,7 @@ def _render_ollama_models() -> None:
         st.sidebar.warning("⚠️ No Ollama models found")
         st.sidebar.caption("Make sure Ollama is running and models are installed")
         if st.sidebar.button("🔄 Refresh Models", use_container_width=True):
+            _refresh_ollama()
             st.rerun()
         return
     
@@ -202,6 +222,7 @@ def _render_ollama_models() -> None:
     
     # Refresh button
     if st.sidebar.button("🔄 Refresh Models", use_container_width=True):
+        _refresh_ollama()
         st.rerun()
 
 
@@ -248,6 +269,13 @@ def render_setup_window() -> None:
         st.caption("• Custom model paths")
         st.caption("• Performance tuning")
         st.caption("• API endpoint configuration")
+        
+        st.divider()
+        if st.button("🗑️ Clear Response Cache", use_container_width=True,
+                     help="Forget cached AI analysis results so they are generated again"):
+            initialize_llm_cache().clear()
+            clear_analysis_cache()
+            st.success("Response cache cleared")
 
 
 def render_complete_sidebar() -> bool:
@@ -291,43 +319,19 @@ def is_model_ready() -> bool:
 
 def initialize_llm_on_startup() -> Optional[PromptService]:
     """Initialize LLM automatically on app startup."""
-    if "startup_llm_initialized" not in st.session_state:
-        st.session_state.startup_llm_initialized = False
-    
-    if not st.session_state.startup_llm_initialized:
+    if not st.session_state.setdefault("startup_llm_initialized", False):
         try:
             # Initialize session state first
             _initialize_session_state()
             
-            # Try LlamaCpp first
-            if MODELS_DIR.exists():
-                gguf_files = [f for f in MODELS_DIR.iterdir() 
-                             if f.is_file() and f.suffix.lower() == '.gguf']
-                if gguf_files:
-                    backend = LlamaCppBackend(str(gguf_files[0]))
-                    if backend.initialize_model():
-                        st.session_state.llm_backend = backend
-                        st.session_state.llm_initialized = True
-                        st.session_state.selected_backend_type = "LlamaCpp"
-                        st.session_state.selected_model = gguf_files[0].name
-                        st.session_state.prompt_service = PromptService(backend)
-                        st.session_state.startup_llm_initialized = True
-                        return st.session_state.prompt_service
-            
-            # Fallback to Ollama
-            available_ollama_models = LLMService.get_ollama_models()
-            if available_ollama_models:
-                backend = OllamaBackend(available_ollama_models[0])
-                if backend.initialize_model():
-                    st.session_state.llm_backend = backend
-                    st.session_state.llm_initialized = True
-                    st.session_state.selected_backend_type = "Ollama"
-                    st.session_state.selected_model = available_ollama_models[0]
-                    st.session_state.prompt_service = PromptService(backend)
-                    st.session_state.startup_llm_initialized = True
-                    return st.session_state.prompt_service
+            # Try LlamaCpp first, then fall back to Ollama
+            local_models = _get_local_models()
+            if not (local_models and _activate_model("LlamaCpp", local_models[0])):
+                ollama_models = LLMService.get_ollama_models()
+                if ollama_models:
+                    _activate_model("Ollama", ollama_models[0])
         
-        except Exception as e:
+        except Exception:
             # Silently fail and let user manually initialize
             pass
         
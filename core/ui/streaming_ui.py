@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import Callable, Optional
+from typing import Callable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,7 +10,6 @@ class StreamingDisplay:
     def __init__(self, container_key: str):
         self.container_key = container_key
         self.container = None
-        self.chunk_counter = 0
     
     def initialize_container(self, label: str = "AI Response"):
         """Initialize the streaming display container."""
@@ -24,30 +23,23 @@ class StreamingDisplay:
                 return
             
             try:
-                # Create unique key for each update
-                self.chunk_counter += 1
-                key_suffix = f"{self.container_key}_{self.chunk_counter}"
-                
                 if is_complete:
-                    # Final display without cursor
+                    # Final display without cursor; rendered once, so the key is stable
                     self.container.text_area(
                         "✅ AI Analysis Complete:",
                         value=content,
                         height=200,
                         disabled=True,
-                        key=f"final_{key_suffix}"
+                        key=f"final_{self.container_key}"
                     )
                 else:
-                    # Streaming display with cursor
-                    self.container.text_area(
-                        "🔄 AI Analysis Stream:",
-                        value=content + "▌",
-                        height=200,
-                        disabled=True,
-                        key=f"stream_{key_suffix}"
-                    )
+                    # Streaming display with cursor. A non-widget element, so
+                    # per-chunk updates don't register a new widget id each time.
+                    with self.container.container():
+                        st.caption("🔄 AI Analysis Stream:")
+                        st.code(content + "▌", language=None, wrap_lines=True, height=200)
             except Exception as e:
-                logger.error(f"Error updating streaming display: {e}")
+                logger.error("Error updating streaming display: %s", e)
                 # Fallback to simple text display
                 if is_complete:
                     self.container.success("✅ Analysis completed")